@@ -1,16 +1,50 @@
 #!/usr/bin/env python3
 import argparse
+import asyncio
+import atexit
+import codecs
+import copy
 import datetime as dt
+import functools
+import hashlib
+import itertools
 import json
+import mmap
 import os
 import re
+import signal
 import sys
+import time
 from pathlib import Path
 
-import requests
-from bs4 import BeautifulSoup
+import httpx
+import msgpack
 from twilio.rest import Client
 
+try:
+    import blake3
+except ImportError:
+    blake3 = None
+
+try:
+    import re2  # google-re2: linear-time matching, no catastrophic backtracking
+except ImportError:
+    re2 = None
+
+try:
+    from selectolax.lexbor import LexborHTMLParser  # optional: only used without lxml
+except ImportError:
+    LexborHTMLParser = None
+
+try:
+    import lxml.html
+    from cssselect import HTMLTranslator, SelectorError, parse as parse_css
+    from cssselect.parser import CombinedSelector, Element
+    from lxml import etree
+    from lxml.cssselect import CSSSelector
+except ImportError:
+    etree = None
+
 # -------- Config from env / GitHub Secrets --------
 URL           = os.getenv("MONITOR_URL", "").strip()
 CSS_SELECTOR  = os.getenv("MONITOR_CSS_SELECTOR", "").strip()
@@ -22,15 +56,87 @@ def env_int(name: str, default: int) -> int:
     except Exception:
         return default
 
+def compile_regex(pattern: str):
+    # RE2 when it supports the pattern; stdlib re for backreferences/lookaround
+    if re2 is not None:
+        opts = re2.Options()
+        opts.case_sensitive = False
+        opts.dot_nl = True
+        opts.log_errors = False  # an unsupported pattern isn't an error here
+        try:
+            return re2.compile(pattern, opts)
+        except re2.error:
+            pass
+    return re.compile(pattern, re.IGNORECASE | re.DOTALL)
+
+try:
+    _REGEX, _REGEX_ERROR = compile_regex(REGEX_CAPTURE) if REGEX_CAPTURE else None, None
+except re.error as e:
+    # Raised from fetch_value instead, so it is logged and alerted like any
+    # other extraction failure rather than crashing every command at import
+    _REGEX, _REGEX_ERROR = None, e
+
 CSS_INDEX = env_int("MONITOR_CSS_INDEX", 0)
+
+# Pseudo-classes whose match depends on content *after* the element can't be
+# decided from a partial document (:has() may look at later siblings).
+_NOT_STREAMABLE = re.compile(r":(nth-last-|last-|only-|empty|has\()", re.IGNORECASE)
+
+# Combinators walked right-to-left, so one element can be tested on its own
+_REVERSE_AXES = {" ": "ancestor::", ">": "parent::", "~": "preceding-sibling::", "+": "preceding-sibling::*[1]/self::"}
+
+def _self_test(tree, tr) -> str:
+    if isinstance(tree, CombinedSelector):
+        return f"{_self_test(tree.subselector, tr)}[{_REVERSE_AXES[tree.combinator]}{_self_test(tree.selector, tr)}]"
+    return str(tr.xpath(tree))
+
+def _key_tag(tree) -> str | None:
+    # Tag of the rightmost compound selector (the element being matched); None for "*"
+    while isinstance(tree, CombinedSelector):
+        tree = tree.subselector
+    while not isinstance(tree, Element):
+        tree = tree.selector
+    return tree.element.lower() if tree.element not in (None, "*") else None
+
+def compile_css_xpath(selector: str):
+    # CSS -> (document XPath, per-element test) for the streaming path; None means use the full-body path
+    if etree is None or not selector or _NOT_STREAMABLE.search(selector):
+        return None
+    tr = HTMLTranslator()
+    try:
+        sels = parse_css(selector)
+        xpath = etree.XPath(tr.css_to_xpath(selector))
+        test = etree.XPath(" | ".join(f"self::{_self_test(sel.parsed_tree, tr)}" for sel in sels))
+    except SelectorError:
+        return None  # the full-body path reports it
+    tags = {_key_tag(sel.parsed_tree) for sel in sels}
+    if None in tags:
+        return xpath, test
+    # Cheap tag check first: the XPath test only runs on candidate elements
+    return xpath, lambda el: el.tag in tags and test(el)
+
+_CSS_XPATH = compile_css_xpath(CSS_SELECTOR)
+STREAM_CHUNK = 8192
+# Pull parsing costs a few times a full parse per byte: when the match hasn't
+# settled within this many bytes, the rest is read and parsed in one go
+STREAM_LIMIT = 256 * 1024
 TIMEOUT_SEC   = int(os.getenv("MONITOR_TIMEOUT_SEC", "30"))
+# Bodies are cut off here so a misbehaving URL can't blow up memory or parse time
+MAX_BYTES     = env_int("MONITOR_MAX_BYTES", 8 * 1024 * 1024)
 
-STATE_FILE    = Path(os.getenv("MONITOR_STATE_FILE", "./state/monitor_state.json"))
+# Optional JSON list of {"url", "selector"?, "index"?, "regex"?} checked concurrently
+TARGETS_FILE  = os.getenv("MONITOR_TARGETS_FILE", "").strip()
+
+STATE_FILE    = Path(os.getenv("MONITOR_STATE_FILE", "./state/monitor_state.msgpack"))
 LOG_DIR       = Path(os.getenv("MONITOR_LOG_DIR", "./logs"))
 
 # Call if extractor fails?
 CALL_ON_ERROR = os.getenv("MONITOR_CALL_ON_ERROR", "0") == "1"
 
+# --daemon: seconds between checks, and UTC "HH:MM" for the daily summary (unset = none)
+INTERVAL_SEC       = env_int("MONITOR_INTERVAL_SEC", 900)
+DAILY_SUMMARY_HHMM = os.getenv("MONITOR_DAILY_SUMMARY_HHMM", "").strip()
+
 TWILIO_SID  = os.getenv("TWILIO_SID", "")
 TWILIO_AUTH = os.getenv("TWILIO_AUTH", "")
 TWILIO_FROM = os.getenv("TWILIO_FROM", "")
@@ -44,64 +150,385 @@ def ensure_dirs():
     STATE_FILE.parent.mkdir(parents=True, exist_ok=True)
     LOG_DIR.mkdir(parents=True, exist_ok=True)
 
+class StateStore:
+    """In-process cache of the msgpack state file. Writes that fit in SIZE
+    bytes go through a fixed-size mmap of the file (NUL-padded, msync'd);
+    larger ones fall back to an atomic rename. JSON state from before the
+    msgpack switch is still read, from the file itself or from its .json
+    sibling when the msgpack file doesn't exist yet. Another process (e.g.
+    --set-state while --daemon runs) may write the file at any time: the
+    shared mapping is re-decoded on every load, and a file replaced by
+    rename is detected by its inode/mtime and read again."""
+
+    SIZE = 4096
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.legacy_path = path.with_suffix(".json")
+        self._state = None
+        self._mm = None
+        self._stamp = None
+
+    def _stat(self):
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return st.st_ino, st.st_mtime_ns, st.st_size
+
+    def _drop_stale_map(self, stamp):
+        if self._mm is not None and (stamp is None or stamp[0] != self._stamp[0]):
+            self.close()  # file replaced or removed behind our back
+
+    def load(self) -> dict | None:
+        stamp = self._stat()
+        self._drop_stale_map(stamp)
+        if self._mm is not None:
+            self._state = self._decode(self._mm[:])
+        elif self._state is None or stamp != self._stamp:
+            if stamp is not None:
+                self._state = self._decode(self.path.read_bytes())
+            elif self.legacy_path.exists():
+                self._state = self._decode(self.legacy_path.read_bytes())
+            else:
+                self._state = None
+        self._stamp = stamp
+        return copy.deepcopy(self._state)
+
+    @staticmethod
+    def _decode(raw: bytes) -> dict | None:
+        if raw.lstrip()[:1] == b"{":  # legacy JSON; a msgpack map never starts with "{"
+            return json.loads(raw.rstrip(b" \0"))
+        unpacker = msgpack.Unpacker(raw=False)  # reads the first object, ignoring the padding
+        unpacker.feed(raw)
+        obj = next(unpacker, None)
+        return obj if isinstance(obj, dict) else None
+
+    def save(self, state: dict):
+        data = msgpack.packb(state)
+        if len(data) <= self.SIZE:
+            self._drop_stale_map(self._stat())
+            self._map()
+            self._mm[:] = data.ljust(self.SIZE, b"\0")
+            self._mm.flush()
+        else:
+            self.close()
+            tmp = self.path.with_name(self.path.name + ".tmp")
+            tmp.write_bytes(data)
+            os.replace(tmp, self.path)
+        self._state = copy.deepcopy(state)
+        self._stamp = self._stat()
+
+    def _map(self):
+        if self._mm is not None:
+            return
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            if os.fstat(fd).st_size != self.SIZE:
+                os.ftruncate(fd, self.SIZE)
+            self._mm = mmap.mmap(fd, self.SIZE)
+        finally:
+            os.close(fd)
+
+    def close(self):
+        if self._mm is not None:
+            self._mm.close()
+            self._mm = None
+
+_STORE = StateStore(STATE_FILE)
+
 def load_state():
-    if STATE_FILE.exists():
-        return json.loads(STATE_FILE.read_text(encoding="utf-8"))
-    return {
+    st = {
         "last_value": None,
         "last_value_hash": None,
         "last_change_ts": None,
         "changes_today": False,
-        "last_summary_day": None
+        "last_summary_day": None,
+        "last_etag": None,
+        "last_modified": None,
+        "last_body_hash": None,
+        "extract_fp": None,
+        "hash_algo": HASH_ALGO
     }
-
-def save_state(state): STATE_FILE.write_text(json.dumps(state, indent=2), encoding="utf-8")
+    saved = _STORE.load()
+    if saved is not None:
+        saved.setdefault("hash_algo", "sha256")  # files written before hash_algo existed
+        st.update(saved)
+    if st["hash_algo"] != HASH_ALGO:
+        # Re-hash stored values so an algorithm switch isn't reported as a change
+        for slot in [st, *st.get("targets", {}).values()]:
+            slot["last_value_hash"] = value_hash(slot["last_value"].encode("utf-8")) if slot["last_value"] is not None else None
+            slot["last_body_hash"] = None
+        st["hash_algo"] = HASH_ALGO
+    return st
+
+def save_state(state): _STORE.save(state)
+
+_LOG_FH = None
+
+def _get_log_fh():
+    # Opened once per process; buffered writes are flushed on errors and at exit
+    global _LOG_FH
+    if _LOG_FH is None:
+        LOG_DIR.mkdir(parents=True, exist_ok=True)
+        _LOG_FH = (LOG_DIR / "monitor.log").open("a", buffering=8192, encoding="utf-8")
+        atexit.register(_LOG_FH.close)
+    return _LOG_FH
+
+def flush_log():
+    if _LOG_FH is not None:
+        _LOG_FH.flush()
 
 def log(msg: str):
-    ensure_dirs()
     line = f"{now_utc().isoformat()} | {msg}\n"
-    (LOG_DIR / "monitor.log").open("a", encoding="utf-8").write(line)
+    fh = _get_log_fh()
+    fh.write(line)
+    if msg.startswith(("ERROR", "[PROBE ERROR]")):
+        fh.flush()
     print(line, end="")
 
-def fetch_content(url: str) -> str:
-    r = requests.get(url, headers={"User-Agent": "AO-Monitor/1.0"}, timeout=TIMEOUT_SEC)
-    r.raise_for_status()
-    return r.text
-
-def _soup(html: str):
-    return BeautifulSoup(html, "html.parser")
-
-def extract_value(html: str) -> str:
+USER_AGENT = "AO-Monitor/1.0"
+
+RETRY_STATUS = (502, 503, 504)
+RETRIES = 3
+
+# One pooled keep-alive HTTP/2 client per process; same-host requests share a connection.
+# httpx advertises gzip/deflate, plus br when the brotli decoder is installed.
+_CLIENT = httpx.Client(
+    transport=httpx.HTTPTransport(  # retries here cover connect errors only
+        http2=True,
+        limits=httpx.Limits(max_keepalive_connections=10),
+        retries=RETRIES,
+    ),
+    headers={"User-Agent": USER_AGENT},
+    follow_redirects=True,
+)
+
+def extract_fp(url: str = URL, selector: str = CSS_SELECTOR, index: int = CSS_INDEX, regex=_REGEX) -> str:
+    # Fingerprint of the extraction config: cache keys recorded for another
+    # url/selector/index/regex say nothing about the value this one would extract
+    return target_key(url, selector, index, regex.pattern if regex is not None else "")
+
+def _conditional_headers(slot: dict | None, fp: str) -> dict:
+    headers = {}
+    if slot and slot.get("last_value_hash") and slot.get("extract_fp") == fp:
+        if slot.get("last_etag"):
+            headers["If-None-Match"] = slot["last_etag"]
+        if slot.get("last_modified"):
+            headers["If-Modified-Since"] = slot["last_modified"]
+    return headers
+
+def fetch_content(url: str, state: dict | None = None, fp: str | None = None) -> httpx.Response:
+    # With state: conditional GET on the validators stored for extraction config fp
+    # (default: the env config), so 304 is possible.
+    # The body is left unread: consume it via iter_capped()/read_body() and close the response.
+    headers = _conditional_headers(state, fp or extract_fp(url))
+    request = _CLIENT.build_request("GET", url, headers=headers, timeout=TIMEOUT_SEC)
+    for attempt in range(RETRIES + 1):
+        r = _CLIENT.send(request, stream=True)
+        if r.status_code not in RETRY_STATUS or attempt == RETRIES:
+            break
+        r.close()
+        time.sleep(0.3 * 2 ** attempt)
+    if r.status_code != 304 and r.is_error:
+        r.close()
+        r.raise_for_status()
+    return r
+
+READ_CHUNK = 64 * 1024
+
+def iter_capped(r: httpx.Response, chunk_size: int = READ_CHUNK):
+    seen = 0
+    for chunk in r.iter_bytes(chunk_size):
+        if seen + len(chunk) > MAX_BYTES:
+            yield chunk[:MAX_BYTES - seen]
+            log(f"Response truncated at {MAX_BYTES} bytes: {r.url}")
+            return
+        seen += len(chunk)
+        yield chunk
+
+def read_body(r: httpx.Response) -> bytes:
+    return b"".join(iter_capped(r))
+
+_META_CHARSET = re.compile(rb"""<meta[^>]+charset\s*=\s*["']?\s*([\w.:-]+)""", re.I)
+
+def body_encoding(r: httpx.Response, head: bytes) -> str:
+    # Header charset, else <meta charset> in the first KiB, else UTF-8.
+    # Always explicit: libxml2 falls back to Latin-1 when it finds neither.
+    if r.charset_encoding:
+        return r.encoding
+    m = _META_CHARSET.search(head[:1024])
+    if m:
+        try:
+            return codecs.lookup(m.group(1).decode("ascii")).name
+        except LookupError:
+            pass
+    return "utf-8"
+
+async def fetch_all(targets: list[dict], slots: dict) -> list:
+    # Concurrent conditional GETs over one keep-alive HTTP/2 client -> (response, capped body)
+    # per target; exceptions are returned, not raised
+    async def get(client, t):
+        fp = extract_fp(t["url"], t["selector"], t["index"], t["regex"])
+        request = client.build_request("GET", t["url"], headers=_conditional_headers(slots[t["key"]], fp))
+        r = await client.send(request, stream=True)
+        try:
+            if r.status_code != 304:
+                r.raise_for_status()
+            body = bytearray()
+            async for chunk in r.aiter_bytes(READ_CHUNK):
+                body += chunk
+                if len(body) > MAX_BYTES:
+                    del body[MAX_BYTES:]
+                    log(f"Response truncated at {MAX_BYTES} bytes: {r.url}")
+                    break
+        finally:
+            await r.aclose()
+        return r, bytes(body)
+
+    limits = httpx.Limits(max_connections=20, max_keepalive_connections=10)
+    async with httpx.AsyncClient(limits=limits, http2=True, timeout=TIMEOUT_SEC,
+                                 headers={"User-Agent": USER_AGENT}, follow_redirects=True) as client:
+        return await asyncio.gather(*(get(client, t) for t in targets), return_exceptions=True)
+
+# lxml with selectors compiled once (same text normalisation as the streaming
+# path); selectolax (Lexbor) if it is installed and lxml isn't
+if etree is not None:
+    _TEXT_NODES = etree.XPath("descendant-or-self::text()[not(ancestor::script) and not(ancestor::style)]")
+
+def _node_text(el) -> str:
+    # Whitespace-normalised text of the subtree, text nodes joined by " "
+    return " ".join(t.strip() for t in _TEXT_NODES(el) if t.strip())
+
+@functools.lru_cache(maxsize=None)
+def css_selector(selector: str):
+    return CSSSelector(selector, translator="html")
+
+@functools.lru_cache(maxsize=None)
+def _html_parser(encoding: str):
+    return lxml.html.HTMLParser(encoding=encoding)
+
+def _lxml_doc(html: str | bytes, encoding: str = "utf-8"):
+    # Bytes in: lxml rejects str input that carries an XML encoding declaration
+    if isinstance(html, str):
+        html, encoding = html.encode("utf-8"), "utf-8"
+    try:
+        return lxml.html.document_fromstring(html, parser=_html_parser(encoding))
+    except etree.ParserError:  # empty document
+        return None
+
+def _lexbor(html: str | bytes, encoding: str = "utf-8"):
+    if isinstance(html, bytes):
+        html = html.decode(encoding, errors="replace")
+    if LexborHTMLParser is None:
+        raise RuntimeError("No HTML parser: pip install lxml cssselect (or selectolax).")
+    return LexborHTMLParser(html)
+
+def _select(html: str | bytes, selector: str, encoding: str = "utf-8") -> list:
+    if etree is not None:
+        doc = _lxml_doc(html, encoding)
+        return css_selector(selector)(doc) if doc is not None else []
+    return _lexbor(html, encoding).css(selector)
+
+def _text(node) -> str:
+    if etree is not None:
+        return _node_text(node)
+    return node.text(separator=" ", strip=True)
+
+def _visible_text(html: str | bytes, encoding: str = "utf-8") -> str:
+    if etree is not None:
+        doc = _lxml_doc(html, encoding)
+    else:
+        doc = _lexbor(html, encoding).root
+    return _text(doc) if doc is not None else ""
+
+def stream_extract(chunks, xpath=_CSS_XPATH, selector: str = CSS_SELECTOR, index: int = CSS_INDEX,
+                   encoding: str = "utf-8", seen: list | None = None) -> str | None:
+    # Feed chunks to a pull parser and stop once match [index] and every match
+    # before it have been closed; their text can no longer change. The document
+    # XPath only runs once enough closed elements passed the per-element test.
+    # With seen, consumed chunks are kept there and None is returned once
+    # STREAM_LIMIT bytes went by unsettled (the caller finishes with a full parse).
+    xpath, match = xpath
+    want = index if index >= 0 else 0
+    parser = etree.HTMLPullParser(events=("end",), encoding=encoding)
+    closed, root, hits = set(), None, []
+    consumed = 0
+    for chunk in chunks:
+        parser.feed(chunk)
+        if seen is not None:
+            seen.append(chunk)
+            consumed += len(chunk)
+        fresh = False
+        for _, el in parser.read_events():
+            if match(el):
+                closed.add(el)
+                fresh = True
+            root = root if root is not None else el.getroottree().getroot()
+        if fresh and len(closed) > want:
+            hits = xpath(root)
+            if len(hits) > want and all(h in closed for h in hits[:want + 1]):
+                break
+        if consumed > STREAM_LIMIT:
+            return None
+    else:
+        try:
+            root = parser.close()
+        except etree.XMLSyntaxError:
+            root = None
+        hits = xpath(root) if root is not None else []  # None: empty document
+
+    if not hits:
+        raise ValueError(f"CSS selector not found: {selector}")
+    i = want if want < len(hits) else 0
+    text = _node_text(hits[i])
+    if not text:
+        raise ValueError(f"No text for selector: {selector}[{i}]")
+    return text
+
+def extract_value(html: str | bytes, selector: str = CSS_SELECTOR, index: int = CSS_INDEX, regex=_REGEX,
+                  encoding: str = "utf-8") -> str:
+    # html: decoded text, or raw bytes in the given encoding (see body_encoding)
     # Prefer CSS if provided
-    if CSS_SELECTOR:
-        els = _soup(html).select(CSS_SELECTOR)
+    if selector:
+        els = _select(html, selector, encoding)
         if not els:
-            raise ValueError(f"CSS selector not found: {CSS_SELECTOR}")
-        i = CSS_INDEX if 0 <= CSS_INDEX < len(els) else 0
-        text = els[i].get_text(" ", strip=True)  # merge across <sup> etc.
+            raise ValueError(f"CSS selector not found: {selector}")
+        i = index if 0 <= index < len(els) else 0
+        text = _text(els[i])  # merged across <sup> etc.
         if not text:
-            raise ValueError(f"No text for selector: {CSS_SELECTOR}[{i}]")
+            raise ValueError(f"No text for selector: {selector}[{i}]")
         return text
 
     # Fallback to regex on VISIBLE TEXT (not raw HTML) if provided
-    if REGEX_CAPTURE:
-        visible = _soup(html).get_text(" ", strip=True)
-        m = re.search(REGEX_CAPTURE, visible, re.IGNORECASE | re.DOTALL)
+    if regex:
+        visible = _visible_text(html, encoding)
+        m = regex.search(visible)
         if not m or not m.group(1):
-            raise ValueError(f"Regex capture found no group: {REGEX_CAPTURE}")
+            raise ValueError(f"Regex capture found no group: {regex.pattern}")
         return m.group(1).strip()
 
     raise ValueError("Set MONITOR_CSS_SELECTOR or MONITOR_REGEX_CAPTURE")
 
-def value_hash(s: str):
-    import hashlib
-    return hashlib.sha256(s.encode("utf-8")).hexdigest()
+# BLAKE3 when available (much faster on large bodies); SHA-256 otherwise
+HASH_ALGO = "blake3" if blake3 is not None else "sha256"
+
+def value_hash(b: bytes) -> str:
+    if blake3 is not None:
+        return blake3.blake3(b).hexdigest()
+    return hashlib.sha256(b).hexdigest()
 
 # -------- Twilio --------
+_TWILIO: Client | None = None
+
 def _twilio():
-    if not all([TWILIO_SID, TWILIO_AUTH, TWILIO_FROM, TWILIO_TO]):
-        raise RuntimeError("Twilio env vars missing (TWILIO_*).")
-    return Client(TWILIO_SID, TWILIO_AUTH)
+    # One client per process so consecutive API calls reuse its HTTP session
+    global _TWILIO
+    if _TWILIO is None:
+        if not all([TWILIO_SID, TWILIO_AUTH, TWILIO_FROM, TWILIO_TO]):
+            raise RuntimeError("Twilio env vars missing (TWILIO_*).")
+        _TWILIO = Client(TWILIO_SID, TWILIO_AUTH)
+    return _TWILIO
 
 def send_call(message: str):
     c = _twilio()
@@ -109,20 +536,91 @@ def send_call(message: str):
     print(f"Placed call SID={call.sid}")
 
 # -------- Core paths --------
+def _cache_keys(state):
+    return (state["last_etag"], state["last_modified"], state["last_body_hash"], state.get("extract_fp"))
+
+def _clear_cache_keys(state):
+    # Stored value no longer reflects the fetched page: force a full fetch next time
+    state["last_etag"] = None
+    state["last_modified"] = None
+    state["last_body_hash"] = None
+    state["extract_fp"] = None
+
+def _read_value(slot, r, url=URL, selector=CSS_SELECTOR, index=CSS_INDEX, regex=_REGEX, xpath=None, body=None):
+    # -> (value, reason); value is None when the page is known unchanged without extracting.
+    # body: already-read bytes (batch path); otherwise the body is read from r here.
+    # Cache keys are only recorded once extraction succeeded.
+    # A 304 is only possible when fp matched (see _conditional_headers)
+    if r.status_code == 304:
+        return None, "304"
+    fp = extract_fp(url, selector, index, regex)
+    value, reason, body_hash = None, None, None
+    if xpath is not None:
+        # Streamed: reading stops at the match, so there is no whole-body hash.
+        # A late or missing match falls through to the full-body path below.
+        chunks = iter_capped(r, STREAM_CHUNK)
+        head = next(chunks, b"")
+        seen = []
+        value = stream_extract(itertools.chain((head,), chunks), xpath, selector, index,
+                               body_encoding(r, head), seen)
+        if value is None:
+            body = b"".join(itertools.chain(seen, chunks))
+    if value is None:
+        if body is None:
+            body = read_body(r)
+        body_hash = value_hash(body)
+        if body_hash == slot.get("last_body_hash") and slot.get("extract_fp") == fp:
+            reason = "body identical"
+        else:
+            value = extract_value(body, selector, index, regex, body_encoding(r, body))
+    slot["last_etag"] = r.headers.get("ETag")
+    slot["last_modified"] = r.headers.get("Last-Modified")
+    slot["last_body_hash"] = body_hash
+    slot["extract_fp"] = fp
+    return value, reason
+
+def fetch_value(state: dict | None = None):
+    # Single-URL fetch + extract; CSS selectors are streamed when possible
+    if _REGEX_ERROR is not None and not CSS_SELECTOR:
+        raise _REGEX_ERROR
+    r = fetch_content(URL, state)
+    try:
+        return _read_value(state if state is not None else {}, r, xpath=_CSS_XPATH)
+    finally:
+        r.close()
+
 def run_check(current_value_override: str | None = None):
+    if TARGETS_FILE and current_value_override is None:
+        try:
+            targets, bad = load_targets(TARGETS_FILE)
+        except Exception as e:
+            log(f"ERROR loading targets file {TARGETS_FILE}: {e}")
+            if CALL_ON_ERROR:
+                try:
+                    send_call("Website monitor error. The targets file could not be loaded.")
+                except Exception as e2:
+                    log(f"ERROR placing error-call: {e2}")
+            return
+        return run_check_all(targets, bad)
     if not URL and current_value_override is None:
-        raise SystemExit("MONITOR_URL is required (unless using --inject-value).")
+        raise SystemExit("MONITOR_URL or MONITOR_TARGETS_FILE is required (unless using --inject-value).")
 
     ensure_dirs()
     state = load_state()
+    cache_keys = _cache_keys(state)
 
     try:
         if current_value_override is None:
-            html = fetch_content(URL)
-            current_value = extract_value(html)
+            current_value, reason = fetch_value(state)
+            if current_value is None:
+                if _cache_keys(state) != cache_keys:
+                    save_state(state)
+                log(f"No change ({reason}). Value: {state['last_value']}")
+                return
         else:
             current_value = current_value_override
-        current_hash = value_hash(current_value)
+            _clear_cache_keys(state)
+        current_hash = value_hash(current_value.encode("utf-8"))
     except Exception as e:
         log(f"ERROR during fetch/extract: {e}")
         if CALL_ON_ERROR:
@@ -133,6 +631,8 @@ def run_check(current_value_override: str | None = None):
         return
 
     if state["last_value_hash"] == current_hash:
+        if _cache_keys(state) != cache_keys:
+            save_state(state)
         log(f"No change. Value: {current_value}")
         return
 
@@ -149,6 +649,100 @@ def run_check(current_value_override: str | None = None):
     except Exception as e:
         log(f"ERROR sending change-call: {e}")
 
+def target_key(url: str, selector: str = "", index: int = 0, pattern: str = "") -> str:
+    # One slot per (url, extraction config): targets sharing a page must not share
+    # cache keys. Stable across HASH_ALGO switches.
+    ident = json.dumps([url, selector, index, pattern])
+    return hashlib.sha256(ident.encode("utf-8")).hexdigest()[:16]
+
+def load_targets(path: str) -> tuple[list[dict], list[str]]:
+    # -> (targets, problems): a bad entry is reported and skipped, the rest still run
+    entries = json.loads(Path(path).read_text(encoding="utf-8"))
+    if not isinstance(entries, list):
+        raise ValueError("expected a JSON list of targets")
+    targets, bad = [], []
+    for n, t in enumerate(entries):
+        try:
+            if not isinstance(t, dict) or not isinstance(t.get("url"), str) or not t["url"].strip():
+                raise ValueError('missing "url"')
+            url = t["url"].strip()
+            selector = (t.get("selector") or "").strip()
+            index = int(t.get("index", 0))
+            pattern = (t.get("regex") or "").strip()
+            targets.append({
+                "url": url,
+                "key": target_key(url, selector, index, pattern),
+                "selector": selector,
+                "index": index,
+                "regex": compile_regex(pattern) if pattern else None,
+            })
+        except Exception as e:
+            bad.append(f"target #{n}: {e}")
+    return targets, bad
+
+def run_check_all(targets: list[dict], bad: list[str] | None = None):
+    bad = bad or []
+    for problem in bad:
+        log(f"ERROR in targets file: {problem}")
+    ensure_dirs()
+    state = load_state()
+    slots = state.setdefault("targets", {})
+    dirty = False
+    for t in targets:
+        if t["key"] not in slots:
+            slots[t["key"]] = {"url": t["url"], "last_value": None, "last_value_hash": None,
+                               "last_change_ts": None, "last_etag": None, "last_modified": None,
+                               "last_body_hash": None, "extract_fp": None}
+            dirty = True
+
+    results = asyncio.run(fetch_all(targets, slots))
+
+    changes, errors = [], list(bad)
+    for t, result in zip(targets, results):
+        url, slot = t["url"], slots[t["key"]]
+        cache_keys = _cache_keys(slot)
+        try:
+            if isinstance(result, Exception):
+                raise result
+            r, body = result
+            value, reason = _read_value(slot, r, url, t["selector"], t["index"], t["regex"], body=body)
+        except Exception as e:
+            log(f"ERROR during fetch/extract [{url}]: {e}")
+            errors.append(url)
+            continue
+        dirty = dirty or _cache_keys(slot) != cache_keys
+
+        if value is None:
+            log(f"No change ({reason}) [{url}]. Value: {slot['last_value']}")
+            continue
+        h = value_hash(value.encode("utf-8"))
+        if slot["last_value_hash"] == h:
+            log(f"No change [{url}]. Value: {value}")
+            continue
+        changes.append((url, slot["last_value"], value))
+        slot["last_value"] = value
+        slot["last_value_hash"] = h
+        slot["last_change_ts"] = now_utc().isoformat()
+
+    if changes:
+        state["changes_today"] = True
+    if changes or dirty:
+        save_state(state)
+
+    if errors and CALL_ON_ERROR:
+        try:
+            send_call(f"Website monitor error. Extraction failed for {len(errors)} of {len(targets) + len(bad)} pages.")
+        except Exception as e:
+            log(f"ERROR placing error-call: {e}")
+
+    if changes:
+        try:
+            send_call(" ".join(f"A change was detected. New value is: {new}." for _, _, new in changes))
+            for url, old, new in changes:
+                log(f"CHANGE detected [{url}]. Old: {old} -> New: {new}. Call sent.")
+        except Exception as e:
+            log(f"ERROR sending change-call: {e}")
+
 def run_daily_summary(force=False):
     st = load_state()
     today = today_key()
@@ -173,6 +767,74 @@ def run_daily_summary(force=False):
     st["changes_today"] = False
     save_state(st)
 
+# -------- Daemon --------
+def _seconds_until(hhmm: str) -> float:
+    h, m = (int(x) for x in hhmm.split(":"))
+    now = now_utc()
+    at = now.replace(hour=h, minute=m, second=0, microsecond=0)
+    if at <= now:
+        at += dt.timedelta(days=1)
+    return (at - now).total_seconds()
+
+async def _run_job(lock: asyncio.Lock, fn, *args):
+    # Jobs share the state file, so they run one at a time, off the event loop
+    async with lock:
+        try:
+            await asyncio.to_thread(fn, *args)
+        except Exception as e:
+            log(f"ERROR in {fn.__name__}: {e}")
+    flush_log()
+
+async def _sleep(stop: asyncio.Event, seconds: float) -> bool:
+    # Wait out the delay unless asked to stop first; True means keep going
+    try:
+        await asyncio.wait_for(stop.wait(), seconds)
+    except asyncio.TimeoutError:
+        pass
+    return not stop.is_set()
+
+# Loops are never cancelled: stop is checked between jobs, so an in-flight
+# job (a worker thread that cannot be interrupted) always runs to completion
+async def _check_loop(lock: asyncio.Lock, stop: asyncio.Event, interval_sec: int):
+    while not stop.is_set():
+        await _run_job(lock, run_check)
+        await _sleep(stop, interval_sec)
+
+async def _summary_loop(lock: asyncio.Lock, stop: asyncio.Event, hhmm: str):
+    while await _sleep(stop, _seconds_until(hhmm)):
+        await _run_job(lock, run_daily_summary)
+
+async def main_loop(interval_sec: int):
+    # Resident replacement for cron: imports, HTTP/Twilio sessions and state stay warm
+    if not URL and not TARGETS_FILE:
+        raise SystemExit("MONITOR_URL or MONITOR_TARGETS_FILE is required for --daemon.")
+    if DAILY_SUMMARY_HHMM:
+        _seconds_until(DAILY_SUMMARY_HHMM)  # fail fast on a malformed value
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, stop.set)
+        except NotImplementedError:  # Windows
+            pass
+
+    lock = asyncio.Lock()
+    tasks = [asyncio.create_task(_check_loop(lock, stop, interval_sec))]
+    if DAILY_SUMMARY_HHMM:
+        tasks.append(asyncio.create_task(_summary_loop(lock, stop, DAILY_SUMMARY_HHMM)))
+    summary = f"daily summary at {DAILY_SUMMARY_HHMM} UTC" if DAILY_SUMMARY_HHMM else "no daily summary"
+    log(f"Daemon started: check every {interval_sec}s, {summary}.")
+    try:
+        await stop.wait()
+        log("Stopping: waiting for the running job to finish.")
+    finally:
+        stop.set()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        log("Daemon stopped.")
+        flush_log()
+        _STORE.close()
+
 # -------- Test / debug helpers --------
 def seed_state_last_value(val: str | None):
     st = load_state()
@@ -181,14 +843,14 @@ def seed_state_last_value(val: str | None):
         st["last_value_hash"] = None
     else:
         st["last_value"] = val
-        st["last_value_hash"] = value_hash(val)
+        st["last_value_hash"] = value_hash(val.encode("utf-8"))
+    _clear_cache_keys(st)
     save_state(st)
     log(f"Seeded state last_value to: {val}")
 
 def probe_once():
     try:
-        html = fetch_content(URL)
-        val = extract_value(html)
+        val, _ = fetch_value()
         print(f"[PROBE] Extracted value: {val}")
         log(f"[PROBE] Extracted value: {val}")
     except Exception as e:
@@ -200,14 +862,19 @@ def probe_once():
                 log(f"ERROR placing probe error-call: {e2}")
 
 def probe_all():
-    html = fetch_content(URL)
+    r = fetch_content(URL)
+    try:
+        html = read_body(r)
+        encoding = body_encoding(r, html)
+    finally:
+        r.close()
     if not CSS_SELECTOR:
         print("[PROBE-ALL] Set MONITOR_CSS_SELECTOR to use this mode.")
         return
-    els = _soup(html).select(CSS_SELECTOR)
+    els = _select(html, CSS_SELECTOR, encoding)
     print(f"[PROBE-ALL] Found {len(els)} matches for '{CSS_SELECTOR}':")
     for idx, el in enumerate(els[:20]):
-        print(f"  [{idx}] {el.get_text(' ', strip=True)[:200]}")
+        print(f"  [{idx}] {_text(el)[:200]}")
 
 # -------- CLI --------
 def main():
@@ -221,8 +888,12 @@ def main():
     p.add_argument("--probe", action="store_true", help="Fetch & print the current extracted value only.")
     p.add_argument("--probe-all", action="store_true", help="List matches for CSS selector.")
     p.add_argument("--test-call", action="store_true", help="Immediate test call.")
+    p.add_argument("--daemon", action="store_true",
+                   help="Run checks (and the daily summary if MONITOR_DAILY_SUMMARY_HHMM is set) in a long-lived loop instead of cron.")
+    p.add_argument("--interval", type=int, default=INTERVAL_SEC, help="Seconds between checks in --daemon mode.")
     args = p.parse_args()
 
+    ensure_dirs()
     if args.reset_state:   seed_state_last_value(None); return
     if args.set_state is not None: seed_state_last_value(args.set_state); return
     if args.test_call:     send_call("This is a test call from the website monitor."); return
@@ -230,6 +901,7 @@ def main():
     if args.probe:         probe_once(); return
     if args.check:         run_check(current_value_override=args.inject_value); return
     if args.daily_summary: run_daily_summary(force=args.force_summary); return
+    if args.daemon:        asyncio.run(main_loop(args.interval)); return
     p.print_help(); sys.exit(1)
 
 if __name__ == "__main__":
@@ -1,5 +1,6 @@
 #!/usr/bin/env python3
 import os
+from concurrent.futures import ThreadPoolExecutor
 from twilio.rest import Client
 
 TWILIO_SID  = os.getenv("TWILIO_SID", "")
@@ -7,8 +8,13 @@ TWILIO_AUTH = os.getenv("TWILIO_AUTH", "")
 TWILIO_FROM = os.getenv("TWILIO_FROM", "")
 TWILIO_TO   = os.getenv("TWILIO_TO", "")
 
+_CLIENT = None
+
 def client():
-    return Client(TWILIO_SID, TWILIO_AUTH)
+    global _CLIENT
+    if _CLIENT is None:
+        _CLIENT = Client(TWILIO_SID, TWILIO_AUTH)
+    return _CLIENT
 
 def send_call():
     c = client()
@@ -34,7 +40,20 @@ if __name__ == "__main__":
     p.add_argument("--call", action="store_true")
     p.add_argument("--sms", action="store_true")
     args = p.parse_args()
-    if args.call: send_call()
-    if args.sms:  send_sms()
-    if not (args.call or args.sms):
+    jobs = [f for f, on in ((send_call, args.call), (send_sms, args.sms)) if on]
+    if not jobs:
         print("Use --call or --sms")
+        raise SystemExit(0)
+    # Independent Twilio round-trips: issue them concurrently on one shared client
+    client()
+    with ThreadPoolExecutor(max_workers=2) as ex:
+        futs = [(f.__name__, ex.submit(f)) for f in jobs]
+    failed = False
+    for name, fut in futs:
+        try:
+            fut.result()
+        except Exception as e:
+            print(f"ERROR in {name}: {e}")
+            failed = True
+    if failed:
+        raise SystemExit(1)